@@ -73,6 +73,7 @@ from utils.helpers import (  # noqa: E402, F401
     _prazo_label,
     _audit,
     _client_ip,
+    flush_audit,
 )
 from utils.passwords import (  # noqa: E402, F401
     generate_password_hash,
@@ -129,6 +130,8 @@ from core.rate_limit import limiter  # noqa: E402
 limiter.init_app(app)
 
 app.teardown_appcontext(close_request_db)
+# Corre antes do teardown do app context — a conexão do request ainda está aberta.
+app.teardown_request(flush_audit)
 
 
 @app.context_processor
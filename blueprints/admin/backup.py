@@ -28,9 +28,14 @@ def admin_backup_download():
         return redirect(url_for(".admin_home"))
     ts = datetime.now().strftime("%Y%m%d_%H%M")
     nome = f"{db_path.stem}_{ts}.db"
-    return send_file(
+    resp = send_file(
         db_path,
         as_attachment=True,
         download_name=nome,
         mimetype="application/x-sqlite3",
     )
+    # Contém hashes de passwords e dados pessoais — nunca em caches partilhadas.
+    resp.cache_control.no_cache = None
+    resp.cache_control.private = True
+    resp.cache_control.no_store = True
+    return resp
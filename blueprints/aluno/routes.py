@@ -727,11 +727,10 @@ def aluno_qr():
     O payload codificado é `NII:<nii>` — basta ler no kiosk para identificar
     o aluno e registar a presença.
     """
-    from core.qr import build_payload, qr_svg_bytes
+    from core.qr import aluno_qr_svg
 
     u = current_user()
-    payload = build_payload(u["nii"])
-    svg = qr_svg_bytes(payload)
+    svg = aluno_qr_svg(u["nii"])
     return Response(
         svg,
         headers={
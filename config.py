@@ -56,6 +56,12 @@ REFEICAO_HORARIOS: dict[str, tuple[str, str]] = {
 # ── Servidor ─────────────────────────────────────────────────────────────────
 PORT: int = int(os.environ.get("PORT", "8080"))
 DEBUG: bool = os.environ.get("DEBUG", "false").lower() == "true"
+STATIC_MAX_AGE: int = int(os.environ.get("STATIC_MAX_AGE", "3600"))
+"""Cache-Control max-age (s) de /static/ — o logo/CSS não voltam a ser pedidos a cada página.
+
+Aplicado só ao endpoint `static` (core/middleware.py); não usar em
+SEND_FILE_MAX_AGE_DEFAULT, que cobriria também o download da BD.
+"""
 
 # ── Observabilidade (Sentry) ─────────────────────────────────────────────────
 # Vazio = desligado (no-op completo). Sem DSN não há overhead, conexões, nada.
@@ -87,7 +93,10 @@ class Config:
 # ── Logging ──────────────────────────────────────────────────────────────────
 def configure_logging(flask_app) -> None:
     """Configura o logger da app Flask — JSON em produção, legível em dev."""
+    import atexit
     import json
+    import logging.handlers
+    import queue
     import sys
 
     class JsonFormatter(logging.Formatter):
@@ -122,7 +131,11 @@ def configure_logging(flask_app) -> None:
                 record.user_role = "-"  # type: ignore[attr-defined]
             return super().format(record)
 
-    handler = logging.StreamHandler(sys.stdout)
+    # Formatação (e filtros request_id/user) no thread do pedido, via
+    # QueueHandler.prepare(); a escrita em stdout corre no thread do
+    # QueueListener, para o pedido não bloquear em I/O do pipe de logs.
+    handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    stream = logging.StreamHandler(sys.stdout)
     if is_production:
         handler.setFormatter(JsonFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
     else:
@@ -132,6 +145,19 @@ def configure_logging(flask_app) -> None:
                 datefmt="%Y-%m-%d %H:%M:%S",
             )
         )
+
+    def _start_listener() -> None:
+        # Uma fila e um listener por processo. Com `gunicorn --preload` a app é
+        # importada no master e os workers herdam o handler via fork — mas não
+        # o thread que esvazia a fila, que tem de ser recriado no filho.
+        handler.queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(handler.queue, stream)
+        listener.start()
+        atexit.register(listener.stop)
+
+    _start_listener()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_start_listener)
     flask_app.logger.addHandler(handler)
     flask_app.logger.setLevel(logging.INFO)
     logging.getLogger("sqlite3").setLevel(logging.WARNING)
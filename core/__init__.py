@@ -30,6 +30,7 @@ from core.constants import BASE_DADOS, BACKUP_DIR, EXPORT_DIR, PRAZO_LIMITE_HORA
 from core.database import (
     close_request_db,
     db,
+    db_read,
     ensure_schema,
     sqlite_quick_check,
     wal_checkpoint,
@@ -55,6 +56,7 @@ from core.meals import (
 
 __all__ = [  # noqa: F822
     "db",
+    "db_read",
     "close_request_db",
     "wal_checkpoint",
     "ensure_schema",
@@ -6,18 +6,17 @@ import logging
 from datetime import date, timedelta
 from typing import Any
 
-from core.absences import utilizador_ausente
 from core.database import db
 from core.meals import (
     _is_friday,
+    _dias_ocupados,
     _is_weekday_mon_to_fri,
     dia_tem_refeicoes,
     dias_operacionais_batch,
-    refeicao_exists,
-    refeicao_save,
     refeicoes_batch,
+    refeicoes_save_batch,
 )
-from core.notifications import notify
+from core.notifications import notify_async
 from core.users import dietas_padrao_batch
 
 log = logging.getLogger(__name__)
@@ -103,7 +102,8 @@ def autopreencher_refeicoes_semanais(dias_a_gerar: int = 14) -> None:
     """Preenche automaticamente refeições para os próximos `dias_a_gerar` dias.
 
     Pré-carrega a janela equivalente da semana anterior por utilizador para evitar
-    N+1 queries; falhas de utilizadores individuais não interrompem o lote.
+    N+1 queries e grava os dias de cada utilizador num único commit; falhas de
+    utilizadores individuais não interrompem o lote.
     """
     today = date.today()
     prev_de = today - timedelta(days=7)
@@ -115,36 +115,43 @@ def autopreencher_refeicoes_semanais(dias_a_gerar: int = 14) -> None:
             users = [dict(r) for r in conn.execute("SELECT id FROM utilizadores")]
         tipos_dia = dias_operacionais_batch(today, window_ate)
         dietas = dietas_padrao_batch()
+        dias_com_refeicoes = [
+            today + timedelta(days=i)
+            for i in range(dias_a_gerar)
+            if _dia_tem_refeicoes_from_map(today + timedelta(days=i), tipos_dia)
+        ]
+        with db() as conn:
+            ocupados = _dias_ocupados(conn, dias_com_refeicoes)
     except Exception as e:
         log.exception("autopreencher_refeicoes_semanais: falha a obter contexto")
-        notify(
+        notify_async(
             "Autopreenchimento falhou",
             f"Não foi possível carregar contexto (utilizadores/dias): {e}",
             severity="error",
         )
         return
 
-    dias_com_refeicoes = [
-        today + timedelta(days=i)
-        for i in range(dias_a_gerar)
-        if _dia_tem_refeicoes_from_map(today + timedelta(days=i), tipos_dia)
-    ]
-
     falhas: list[int] = []
     for u in users:
         uid = u["id"]
         dieta = dietas.get(uid, "Normal")
         try:
             prev_meals, _ = refeicoes_batch(uid, prev_de, prev_ate)
+            pendentes: list[tuple[date, dict[str, Any]]] = []
             for d in dias_com_refeicoes:
-                if utilizador_ausente(uid, d):
-                    continue
-                if refeicao_exists(uid, d):
+                if (uid, d.isoformat()) in ocupados:
                     continue
                 base = _default_refeicao_para_dia_precomputado(d, tipos_dia, dieta)
                 prev_row = prev_meals.get((d - timedelta(days=7)).isoformat(), {})
                 final = _carry_forward(prev_row, base)
-                refeicao_save(uid, d, final, alterado_por="sistema")
+                pendentes.append((d, final))
+            # Uma transação por utilizador em vez de um commit por dia. O
+            # snapshot `ocupados` pode estar desatualizado (edição do aluno entre
+            # a leitura e este ponto) — `apenas_livres` re-verifica na transação.
+            if not refeicoes_save_batch(
+                uid, pendentes, alterado_por="sistema", apenas_livres=True
+            ):
+                falhas.append(uid)
         except Exception:
             falhas.append(uid)
             log.exception("autopreencher: falha para uid=%s", uid)
@@ -155,7 +162,7 @@ def autopreencher_refeicoes_semanais(dias_a_gerar: int = 14) -> None:
             len(falhas),
             falhas,
         )
-        notify(
+        notify_async(
             "Autopreenchimento: falhas parciais",
             f"{len(falhas)} utilizador(es) falharam: {falhas[:20]}"
             + (" …" if len(falhas) > 20 else ""),
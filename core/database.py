@@ -4,6 +4,10 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.request import pathname2url
 
 log = logging.getLogger(__name__)
 
@@ -11,18 +15,53 @@ import core.constants
 from core.schema import SCHEMA_SQL
 
 
-def _new_conn() -> sqlite3.Connection:
-    """Cria uma nova conexão SQLite com pragmas de performance."""
-    conn = sqlite3.connect(core.constants.BASE_DADOS)
+def _configure(conn: sqlite3.Connection) -> None:
+    """Aplica os pragmas por-conexão.
+
+    `journal_mode=WAL` é persistente no ficheiro e é aplicado uma única vez
+    no arranque (`ensure_schema`), não a cada conexão. Sem `mmap_size`: o
+    restauro (`restore_backup`) reescreve o ficheiro no mesmo inode, e páginas
+    mapeadas numa conexão aberta dariam SIGBUS ao worker.
+    """
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA busy_timeout=8000")
-    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA foreign_keys=ON")
     conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("PRAGMA cache_size=-4000")  # 4 MB cache
+
+
+def _new_conn() -> sqlite3.Connection:
+    """Cria uma nova conexão SQLite com pragmas de performance."""
+    conn = sqlite3.connect(core.constants.BASE_DADOS)
+    _configure(conn)
     return conn
 
 
+@contextmanager
+def db_read() -> Iterator[sqlite3.Connection]:
+    """Conexão para consultas sem escrita.
+
+    Dentro de um request reutiliza a conexão do request (`db()`); fora dele
+    abre uma conexão própria e fecha-a no fim.
+    """
+    in_request = False
+    try:
+        from flask import has_request_context
+
+        in_request = has_request_context()
+    except ImportError:
+        pass
+    if in_request:
+        yield db()
+        return
+    conn = _new_conn()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
 def db() -> sqlite3.Connection:
     """Devolve conexão SQLite reutilizável por request (via Flask g) ou nova."""
     try:
@@ -143,14 +182,75 @@ def sqlite_quick_check() -> bool:
         return False
 
 
-def ensure_schema() -> None:
-    with db() as conn:
-        fts_ok = False
+def fts_healthy(conn: sqlite3.Connection) -> bool:
+    """True se `utilizadores_fts` existe e abre sem erro.
+
+    Consulta o `sqlite_master` e lê uma linha da tabela virtual com `LIMIT 1`
+    (falha se a definição estiver estragada) — evita o `COUNT(*)`, que
+    percorria a tabela inteira em cada arranque.
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='utilizadores_fts'"
+    ).fetchone()
+    if not existe:
+        return False
+    try:
+        conn.execute("SELECT rowid FROM utilizadores_fts LIMIT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+# Thread do último repovoamento da FTS em background (exposta para testes).
+_fts_thread: threading.Thread | None = None
+
+
+def populate_fts(conn: sqlite3.Connection) -> None:
+    """Repovoa `utilizadores_fts` (comando 'rebuild') a partir de `utilizadores`.
+
+    Com BD em ficheiro corre num thread daemon com ligação própria, para não
+    atrasar o arranque. Nos chamadores atuais a tabela recriada já está
+    confirmada quando o thread arranca (`ensure_schema` usa `executescript`,
+    que faz commit; `_repair_fts` corre antes de qualquer BEGIN, com o DDL em
+    autocommit). Se `conn` ainda tiver uma transação aberta, o `BEGIN
+    IMMEDIATE` do thread espera pelo lock (até 30 s) e, havendo rollback, o
+    rebuild falha e fica só no log. Abre com `mode=rw` para nunca criar uma
+    BD vazia se o ficheiro tiver desaparecido. BD em memória não é
+    partilhável entre ligações → síncrono.
+    """
+    global _fts_thread
+    rebuild = "INSERT INTO utilizadores_fts(utilizadores_fts) VALUES('rebuild')"
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not path:
+        conn.execute(rebuild)
+        return
+
+    def _run() -> None:
         try:
-            conn.execute("SELECT COUNT(*) FROM utilizadores_fts").fetchone()
-            fts_ok = True
+            bg = sqlite3.connect(
+                f"file:{pathname2url(path)}?mode=rw",
+                uri=True,
+                timeout=30,
+                isolation_level=None,
+            )
+            try:
+                bg.execute("BEGIN IMMEDIATE")
+                bg.execute(rebuild)
+                bg.execute("COMMIT")
+            finally:
+                bg.close()
+            log.info("FTS repovoada com sucesso.")
         except Exception:
-            pass
+            log.exception("Falha a repovoar FTS em background")
+
+    _fts_thread = threading.Thread(target=_run, daemon=True, name="fts-rebuild")
+    _fts_thread.start()
+
+
+def ensure_schema() -> None:
+    with db() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        fts_ok = fts_healthy(conn)
 
         if not fts_ok:
             try:
@@ -161,10 +261,6 @@ def ensure_schema() -> None:
         conn.executescript(SCHEMA_SQL)
 
         if not fts_ok:
-            try:
-                conn.execute(
-                    "INSERT INTO utilizadores_fts(utilizadores_fts) VALUES('rebuild')"
-                )
-            except sqlite3.Error:
-                pass
+            log.info("FTS recriada — a repovoar índice.")
+            populate_fts(conn)
         conn.commit()
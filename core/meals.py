@@ -226,6 +226,70 @@ _CAMPOS_AUDIT = (
 )
 
 
+def _refeicao_upsert(
+    conn: sqlite3.Connection,
+    uid: int,
+    dd: str,
+    r: dict[str, Any],
+    alterado_por: str,
+) -> None:
+    """UPSERT de uma refeição + log dos campos alterados (sem gerir a transação)."""
+    anterior_row = conn.execute(
+        "SELECT * FROM refeicoes WHERE utilizador_id=? AND data=?",
+        (uid, dd),
+    ).fetchone()
+    anterior = dict(anterior_row) if anterior_row else {}
+
+    det = conn.execute(
+        "SELECT 1 FROM detencoes"
+        " WHERE utilizador_id=? AND detido_de<=? AND detido_ate>=?"
+        " LIMIT 1",
+        (uid, dd, dd),
+    ).fetchone()
+    if det:
+        r["jantar_sai_unidade"] = 0
+
+    conn.execute(
+        """
+        INSERT INTO refeicoes
+          (utilizador_id, data, pequeno_almoco, lanche, almoco, jantar_tipo, jantar_sai_unidade, almoco_estufa, jantar_estufa)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(utilizador_id, data) DO UPDATE SET
+            pequeno_almoco=excluded.pequeno_almoco,
+            lanche=excluded.lanche,
+            almoco=excluded.almoco,
+            jantar_tipo=excluded.jantar_tipo,
+            jantar_sai_unidade=excluded.jantar_sai_unidade,
+            almoco_estufa=excluded.almoco_estufa,
+            jantar_estufa=excluded.jantar_estufa
+    """,
+        (
+            uid,
+            dd,
+            r.get("pequeno_almoco", 0),
+            r.get("lanche", 0),
+            r.get("almoco"),
+            r.get("jantar_tipo"),
+            r.get("jantar_sai_unidade", 0),
+            r.get("almoco_estufa", 0),
+            r.get("jantar_estufa", 0),
+        ),
+    )
+
+    for campo in _CAMPOS_AUDIT:
+        val_antes = (
+            str(anterior.get(campo)) if anterior.get(campo) is not None else None
+        )
+        val_depois = str(r.get(campo)) if r.get(campo) is not None else None
+        if val_antes != val_depois:
+            conn.execute(
+                "INSERT INTO refeicoes_log"
+                " (utilizador_id, data_refeicao, campo, valor_antes, valor_depois, alterado_por)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (uid, dd, campo, val_antes, val_depois, alterado_por),
+            )
+
+
 def refeicao_save(
     uid: int, d: date, r: dict[str, Any], alterado_por: str = "sistema"
 ) -> bool:
@@ -234,7 +298,52 @@ def refeicao_save(
     A leitura do "antes" e o UPSERT correm numa transação `BEGIN IMMEDIATE` para
     garantir que o log não vê um estado estale entre writers concorrentes.
     """
-    dd = d.isoformat()
+    return refeicoes_save_batch(uid, [(d, r)], alterado_por=alterado_por)
+
+
+def _dias_ocupados(
+    conn: sqlite3.Connection, dias: list[date], uid: int | None = None
+) -> set[tuple[int, str]]:
+    """Pares (uid, data ISO) de `dias` já com refeição ou com ausência ativa.
+
+    Uma única query para a janela inteira; com `uid`, restringe a esse
+    utilizador.
+    """
+    if not dias:
+        return set()
+    isos = [d.isoformat() for d in dias]
+    values = ",".join("(?)" for _ in isos)
+    filtro_r = " AND r.utilizador_id = ?" if uid is not None else ""
+    filtro_a = " AND a.utilizador_id = ?" if uid is not None else ""
+    sql = f"""
+        WITH dias(d) AS (VALUES {values})
+        SELECT r.utilizador_id, r.data
+          FROM refeicoes r JOIN dias ON r.data = dias.d{filtro_r}
+        UNION
+        SELECT a.utilizador_id, dias.d
+          FROM dias JOIN ausencias a
+            ON a.ausente_de <= dias.d AND a.ausente_ate >= dias.d{filtro_a}
+    """  # nosec B608 — apenas placeholders "(?)" e filtros fixos interpolados
+    params = (*isos, uid, uid) if uid is not None else isos
+    return {(row[0], row[1]) for row in conn.execute(sql, params)}
+
+
+def refeicoes_save_batch(
+    uid: int,
+    itens: list[tuple[date, dict[str, Any]]],
+    alterado_por: str = "sistema",
+    *,
+    apenas_livres: bool = False,
+) -> bool:
+    """Guarda várias refeições do mesmo utilizador numa única transação.
+
+    Mesmo contrato que `refeicao_save`, mas com um só `BEGIN IMMEDIATE`/commit
+    para o lote inteiro (tudo ou nada). Usado em caminhos bulk (autopreenchimento).
+    Com `apenas_livres`, os dias já com refeição ou ausência são re-verificados
+    dentro da transação e saltados — nunca sobrepõe uma edição concorrente.
+    """
+    if not itens:
+        return True
     try:
         with db() as conn:
             started_tx = False
@@ -242,63 +351,13 @@ def refeicao_save(
                 conn.execute("BEGIN IMMEDIATE")
                 started_tx = True
             try:
-                anterior_row = conn.execute(
-                    "SELECT * FROM refeicoes WHERE utilizador_id=? AND data=?",
-                    (uid, dd),
-                ).fetchone()
-                anterior = dict(anterior_row) if anterior_row else {}
-
-                det = conn.execute(
-                    "SELECT 1 FROM detencoes"
-                    " WHERE utilizador_id=? AND detido_de<=? AND detido_ate>=?"
-                    " LIMIT 1",
-                    (uid, dd, dd),
-                ).fetchone()
-                if det:
-                    r["jantar_sai_unidade"] = 0
-
-                conn.execute(
-                    """
-                    INSERT INTO refeicoes
-                      (utilizador_id, data, pequeno_almoco, lanche, almoco, jantar_tipo, jantar_sai_unidade, almoco_estufa, jantar_estufa)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(utilizador_id, data) DO UPDATE SET
-                        pequeno_almoco=excluded.pequeno_almoco,
-                        lanche=excluded.lanche,
-                        almoco=excluded.almoco,
-                        jantar_tipo=excluded.jantar_tipo,
-                        jantar_sai_unidade=excluded.jantar_sai_unidade,
-                        almoco_estufa=excluded.almoco_estufa,
-                        jantar_estufa=excluded.jantar_estufa
-                """,
-                    (
-                        uid,
-                        dd,
-                        r.get("pequeno_almoco", 0),
-                        r.get("lanche", 0),
-                        r.get("almoco"),
-                        r.get("jantar_tipo"),
-                        r.get("jantar_sai_unidade", 0),
-                        r.get("almoco_estufa", 0),
-                        r.get("jantar_estufa", 0),
-                    ),
-                )
-
-                for campo in _CAMPOS_AUDIT:
-                    val_antes = (
-                        str(anterior.get(campo))
-                        if anterior.get(campo) is not None
-                        else None
-                    )
-                    val_depois = str(r.get(campo)) if r.get(campo) is not None else None
-                    if val_antes != val_depois:
-                        conn.execute(
-                            "INSERT INTO refeicoes_log"
-                            " (utilizador_id, data_refeicao, campo, valor_antes, valor_depois, alterado_por)"
-                            " VALUES (?, ?, ?, ?, ?, ?)",
-                            (uid, dd, campo, val_antes, val_depois, alterado_por),
-                        )
-
+                if apenas_livres:
+                    ocupados = _dias_ocupados(conn, [d for d, _ in itens], uid)
+                    itens = [
+                        (d, r) for d, r in itens if (uid, d.isoformat()) not in ocupados
+                    ]
+                for d, r in itens:
+                    _refeicao_upsert(conn, uid, d.isoformat(), r, alterado_por)
                 if started_tx:
                     conn.commit()
                 return True
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import gzip
 import logging
+import os
 import secrets
 import threading
 import time
+from functools import lru_cache
 from uuid import uuid4
 
 from flask import (
@@ -19,6 +22,7 @@ from flask import (
     session,
     url_for,
 )
+from werkzeug.security import safe_join
 
 import config as cfg
 from core.database import wal_checkpoint
@@ -31,6 +35,65 @@ _route_metrics: dict[str, dict] = {}
 _WAL_CHECKPOINT_INTERVAL = 300  # checkpoint WAL a cada 5 min
 _last_wal_checkpoint = 0.0
 
+# Estáticos de texto servidos com Content-Encoding: gzip (imagens já vêm comprimidas).
+_GZIP_MIMETYPES = frozenset(
+    {
+        "text/css",
+        "text/javascript",
+        "application/javascript",
+        "application/json",
+        "application/manifest+json",
+        "image/svg+xml",
+    }
+)
+_GZIP_MIN_BYTES = 1024
+
+
+@lru_cache(maxsize=64)
+def _gzip_static_bytes(path: str, mtime_ns: int, size: int) -> bytes:
+    """Versão gzip de um ficheiro estático, comprimida uma vez por (mtime, tamanho)."""
+    with open(path, "rb") as fh:
+        return gzip.compress(fh.read(), compresslevel=9, mtime=0)
+
+
+def _gzip_static_response(app: Flask, r):
+    """Troca o corpo de um estático de texto pela versão gzip pré-comprimida.
+
+    O ETag ganha o sufixo `-gz` (representação diferente, mantém-se fraco se já
+    o era) e o pedido condicional é reavaliado, para que revalidações continuem a
+    devolver 304. Pedidos com `Range` ficam sem gzip (os bytes pedidos referem-se
+    ao ficheiro original) e a versão gzip deixa de anunciar `Accept-Ranges`.
+    """
+    r.vary.add("Accept-Encoding")
+    if (
+        r.status_code != 200
+        or r.mimetype not in _GZIP_MIMETYPES
+        or "Content-Encoding" in r.headers
+        or "gzip" not in request.accept_encodings
+        or "Range" in request.headers
+    ):
+        return r
+    filename = (request.view_args or {}).get("filename")
+    path = safe_join(app.static_folder, filename) if filename else None
+    if not path:
+        return r
+    try:
+        st = os.stat(path)
+    except OSError:
+        return r
+    if st.st_size < _GZIP_MIN_BYTES:
+        return r
+    body = _gzip_static_bytes(path, st.st_mtime_ns, st.st_size)
+    etag, weak = r.get_etag()
+    r.close()
+    r.direct_passthrough = False
+    r.set_data(body)
+    r.headers["Content-Encoding"] = "gzip"
+    r.headers.pop("Accept-Ranges", None)
+    if etag:
+        r.set_etag(f"{etag}-gz", weak=weak)
+    return r.make_conditional(request)
+
 
 class RequestIdFilter(logging.Filter):
     """Injecta request_id nos log records."""
@@ -130,6 +193,13 @@ def register_middleware(app: Flask) -> None:
         # Request ID no response
         r.headers["X-Request-ID"] = getattr(g, "request_id", "")
 
+        if request.endpoint == "static":
+            r = _gzip_static_response(app, r)
+            if r.status_code in (200, 304):
+                r.cache_control.no_cache = None
+                r.cache_control.public = True
+                r.cache_control.max_age = cfg.STATIC_MAX_AGE
+
         r.headers.setdefault("X-Content-Type-Options", "nosniff")
         r.headers.setdefault("X-Frame-Options", "SAMEORIGIN")
         r.headers.setdefault("Referrer-Policy", "strict-origin-when-cross-origin")
@@ -3,6 +3,8 @@
 Cada migração é uma função registada com um nome único.
 Migrações aplicadas são guardadas na tabela `_migracoes`.
 Ordem de execução: pela posição na lista MIGRATIONS.
+`PRAGMA user_version` guarda `SCHEMA_VERSION` depois de aplicar tudo, para que
+arranques seguintes saltem a consulta a `_migracoes` (a lista é append-only).
 """
 
 from __future__ import annotations
@@ -10,7 +12,7 @@ from __future__ import annotations
 import logging
 import sqlite3
 
-from core.database import db
+from core.database import db, fts_healthy, populate_fts
 from utils.passwords import generate_password_hash
 
 log = logging.getLogger(__name__)
@@ -30,6 +32,11 @@ def _applied(conn: sqlite3.Connection) -> set[str]:
     return {r["nome"] for r in conn.execute("SELECT nome FROM _migracoes").fetchall()}
 
 
+def _cols(conn: sqlite3.Connection, table: str) -> set[str]:
+    """Nomes das colunas de `table` (set — membership O(1))."""
+    return {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}  # nosec B608
+
+
 def _mark(conn: sqlite3.Connection, name: str) -> None:
     conn.execute(
         "INSERT INTO _migracoes VALUES(?, datetime('now','localtime'))", (name,)
@@ -43,9 +50,7 @@ def _mark(conn: sqlite3.Connection, name: str) -> None:
 
 def _add_email_telemovel(conn: sqlite3.Connection) -> None:
     """Adiciona colunas email e telemovel à tabela utilizadores."""
-    cols = [
-        r["name"] for r in conn.execute("PRAGMA table_info(utilizadores)").fetchall()
-    ]
+    cols = _cols(conn, "utilizadores")
     if "email" not in cols:
         conn.execute("ALTER TABLE utilizadores ADD COLUMN email TEXT")
     if "telemovel" not in cols:
@@ -54,9 +59,7 @@ def _add_email_telemovel(conn: sqlite3.Connection) -> None:
 
 def _add_is_active(conn: sqlite3.Connection) -> None:
     """Adiciona coluna is_active à tabela utilizadores."""
-    cols = [
-        r["name"] for r in conn.execute("PRAGMA table_info(utilizadores)").fetchall()
-    ]
+    cols = _cols(conn, "utilizadores")
     if "is_active" not in cols:
         conn.execute(
             "ALTER TABLE utilizadores ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1"
@@ -65,9 +68,7 @@ def _add_is_active(conn: sqlite3.Connection) -> None:
 
 def _add_turma_id(conn: sqlite3.Connection) -> None:
     """Adiciona coluna turma_id à tabela utilizadores."""
-    cols = [
-        r["name"] for r in conn.execute("PRAGMA table_info(utilizadores)").fetchall()
-    ]
+    cols = _cols(conn, "utilizadores")
     if "turma_id" not in cols:
         conn.execute(
             "ALTER TABLE utilizadores ADD COLUMN turma_id INTEGER REFERENCES turmas(id)"
@@ -76,7 +77,7 @@ def _add_turma_id(conn: sqlite3.Connection) -> None:
 
 def _add_estufa_columns(conn: sqlite3.Connection) -> None:
     """Adiciona colunas almoco_estufa e jantar_estufa à tabela refeicoes."""
-    cols = [r["name"] for r in conn.execute("PRAGMA table_info(refeicoes)").fetchall()]
+    cols = _cols(conn, "refeicoes")
     if "almoco_estufa" not in cols:
         conn.execute("ALTER TABLE refeicoes ADD COLUMN almoco_estufa BOOLEAN DEFAULT 0")
     if "jantar_estufa" not in cols:
@@ -85,7 +86,7 @@ def _add_estufa_columns(conn: sqlite3.Connection) -> None:
 
 def _add_licenca_horas(conn: sqlite3.Connection) -> None:
     """Adiciona colunas hora_saida e hora_entrada à tabela licencas."""
-    cols = [r["name"] for r in conn.execute("PRAGMA table_info(licencas)").fetchall()]
+    cols = _cols(conn, "licencas")
     if "hora_saida" not in cols:
         conn.execute("ALTER TABLE licencas ADD COLUMN hora_saida TEXT")
     if "hora_entrada" not in cols:
@@ -94,7 +95,7 @@ def _add_licenca_horas(conn: sqlite3.Connection) -> None:
 
 def _add_ausencia_horarios(conn: sqlite3.Connection) -> None:
     """Adiciona colunas hora_inicio, hora_fim, estufa_almoco, estufa_jantar à tabela ausencias."""
-    cols = [r["name"] for r in conn.execute("PRAGMA table_info(ausencias)").fetchall()]
+    cols = _cols(conn, "ausencias")
     if "hora_inicio" not in cols:
         conn.execute("ALTER TABLE ausencias ADD COLUMN hora_inicio TEXT")
     if "hora_fim" not in cols:
@@ -112,9 +113,7 @@ def _add_dieta_padrao(conn: sqlite3.Connection) -> None:
     autopreenchimento em vez de hard-coded "Normal". Pode ser sempre
     sobreposta por refeição através do form normal de edição.
     """
-    cols = [
-        r["name"] for r in conn.execute("PRAGMA table_info(utilizadores)").fetchall()
-    ]
+    cols = _cols(conn, "utilizadores")
     if "dieta_padrao" not in cols:
         conn.execute(
             "ALTER TABLE utilizadores ADD COLUMN dieta_padrao TEXT "
@@ -124,12 +123,9 @@ def _add_dieta_padrao(conn: sqlite3.Connection) -> None:
 
 
 def _repair_fts(conn: sqlite3.Connection) -> None:
-    """Verifica e repara FTS5 se corrompida."""
-    try:
-        conn.execute("SELECT COUNT(*) FROM utilizadores_fts").fetchone()
-        return  # FTS OK
-    except Exception:
-        pass
+    """Verifica (`fts_healthy`) e repara FTS5 se corrompida."""
+    if fts_healthy(conn):
+        return
 
     log.warning("FTS corrompida — a recriar...")
     for trg in (
@@ -150,10 +146,6 @@ def _repair_fts(conn: sqlite3.Connection) -> None:
         "CREATE VIRTUAL TABLE IF NOT EXISTS utilizadores_fts"
         " USING fts5(Nome_completo, content='utilizadores', content_rowid='id')"
     )
-    conn.execute(
-        "INSERT OR IGNORE INTO utilizadores_fts(rowid, Nome_completo)"
-        " SELECT id, Nome_completo FROM utilizadores"
-    )
     conn.execute(
         "CREATE TRIGGER IF NOT EXISTS utilizadores_ai_fts"
         " AFTER INSERT ON utilizadores BEGIN"
@@ -174,7 +166,8 @@ def _repair_fts(conn: sqlite3.Connection) -> None:
         "  INSERT INTO utilizadores_fts(rowid, Nome_completo)"
         " VALUES (NEW.id, NEW.Nome_completo); END"
     )
-    log.info("FTS recriada com sucesso.")
+    log.info("FTS recriada — a repovoar índice.")
+    populate_fts(conn)
 
 
 # ---------------------------------------------------------------------------
@@ -210,7 +203,9 @@ def _add_checkin_tokens(conn: sqlite3.Connection) -> None:
     QR rotativo (URL com token TTL ~60s) que o aluno scaneia com a câmara
     do telemóvel — abre /checkin?token=… e regista entrada/saída.
     """
-    conn.executescript(
+    # execute() por statement (não executescript, que faz COMMIT implícito e
+    # partiria a transação única de run_migrations).
+    for stmt in (
         """
         CREATE TABLE IF NOT EXISTS checkin_tokens (
           token       TEXT PRIMARY KEY,
@@ -218,9 +213,10 @@ def _add_checkin_tokens(conn: sqlite3.Connection) -> None:
           expires_at  TEXT NOT NULL,
           created_by  INTEGER NOT NULL REFERENCES utilizadores(id) ON DELETE CASCADE,
           tipo        TEXT NOT NULL CHECK(tipo IN ('entrada','saida','auto'))
-        );
-        CREATE INDEX IF NOT EXISTS idx_checkin_tokens_exp ON checkin_tokens(expires_at);
-
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_checkin_tokens_exp ON checkin_tokens(expires_at)",
+        """
         CREATE TABLE IF NOT EXISTS checkin_log (
           id            INTEGER PRIMARY KEY AUTOINCREMENT,
           utilizador_id INTEGER NOT NULL REFERENCES utilizadores(id) ON DELETE CASCADE,
@@ -230,11 +226,12 @@ def _add_checkin_tokens(conn: sqlite3.Connection) -> None:
           ip            TEXT,
           user_agent    TEXT,
           UNIQUE(utilizador_id, token)
-        );
-        CREATE INDEX IF NOT EXISTS idx_checkin_log_uid_ts ON checkin_log(utilizador_id, ts);
-        CREATE INDEX IF NOT EXISTS idx_checkin_log_token ON checkin_log(token);
-        """
-    )
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_checkin_log_uid_ts ON checkin_log(utilizador_id, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_checkin_log_token ON checkin_log(token)",
+    ):
+        conn.execute(stmt)
 
 
 def _add_reset_code(conn: sqlite3.Connection) -> None:
@@ -244,9 +241,7 @@ def _add_reset_code(conn: sqlite3.Connection) -> None:
     válido durante 24h, utilizador faz login com ele e é redirigido para
     /auth/change-password. Código invalida-se no uso (single-use).
     """
-    cols = [
-        r["name"] for r in conn.execute("PRAGMA table_info(utilizadores)").fetchall()
-    ]
+    cols = _cols(conn, "utilizadores")
     if "reset_code" not in cols:
         conn.execute("ALTER TABLE utilizadores ADD COLUMN reset_code TEXT")
     if "reset_expires" not in cols:
@@ -294,6 +289,8 @@ MIGRATIONS: list[tuple[str, callable]] = [
     ("reset_creds_nii_v2", _reset_aluno_creds),
 ]
 
+SCHEMA_VERSION = len(MIGRATIONS)
+
 # Checks que correm sempre (não versionados) — ex: FTS pode corromper a qualquer momento
 ALWAYS_RUN: list[callable] = [_repair_fts]
 
@@ -316,9 +313,17 @@ def run_migrations(conn: sqlite3.Connection | None = None) -> list[str]:
             except Exception as exc:
                 log.warning("Always-run check %s falhou: %s", fn.__name__, exc)
 
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            conn.commit()
+            return []
+
         applied = _applied(conn)
         newly_applied: list[str] = []
 
+        # Todas as migrações pendentes numa só transação: tudo ou nada, e um
+        # único bump do schema cookie em vez de um por ALTER TABLE.
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
         for name, fn in MIGRATIONS:
             if name in applied:
                 continue
@@ -327,12 +332,17 @@ def run_migrations(conn: sqlite3.Connection | None = None) -> list[str]:
             _mark(conn, name)
             newly_applied.append(name)
 
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION:d}")
         conn.commit()
         if newly_applied:
             log.info("Migrações aplicadas: %s", ", ".join(newly_applied))
         return newly_applied
     except Exception as exc:
         log.error("Erro ao correr migrações: %s", exc)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
         return []
     finally:
         if owns_conn:
@@ -12,6 +12,8 @@ Design:
   - Falhas do notifier **nunca** levantam excepção para o chamador; apenas loggam.
   - `notify()` é thread-safe na medida em que o cache é imutável após a 1ª
     chamada; os backends usam clientes efémeros por chamada.
+  - `notify_async()` entrega a notificação a um pool de threads persistente, para
+    não bloquear pedidos HTTP (ex.: cron) durante o envio SMTP/webhook.
   - `reset_notifier_cache()` existe para testes.
 """
 
@@ -23,6 +25,7 @@ import os
 import smtplib
 import urllib.parse
 import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
 from email.message import EmailMessage
 from functools import lru_cache
 from typing import Protocol
@@ -200,6 +203,15 @@ def notify(title: str, message: str, severity: Severity = "info") -> None:
         log.exception("notify() falhou inesperadamente")
 
 
+# Pool persistente: as threads só são criadas à medida que há trabalho.
+_notif_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notif")
+
+
+def notify_async(title: str, message: str, severity: Severity = "info") -> Future:
+    """Como `notify()`, mas corre no pool `_notif_pool` e retorna logo."""
+    return _notif_pool.submit(notify, title, message, severity)
+
+
 def reset_notifier_cache() -> None:
     """Limpa o cache do notifier — usado por testes ao mexer em env vars."""
     clear = getattr(_get_notifier, "cache_clear", None)
@@ -214,5 +226,6 @@ __all__ = [
     "WebhookNotifier",
     "SMTPNotifier",
     "notify",
+    "notify_async",
     "reset_notifier_cache",
 ]
@@ -17,6 +17,7 @@ from __future__ import annotations
 import html
 import io
 import logging
+from functools import lru_cache
 
 log = logging.getLogger(__name__)
 
@@ -47,6 +48,7 @@ def qr_svg_bytes(data: str) -> bytes:
 
     Se a lib `qrcode` não estiver instalada, devolve um SVG de fallback
     que mostra o texto em plano — cliente ainda pode copiar o NII à mão.
+    Sem cache: o kiosk chama-a com um token de check-in novo a cada poll.
     """
     try:
         import qrcode
@@ -71,6 +73,16 @@ def build_payload(nii: str) -> str:
     return f"{QR_PAYLOAD_PREFIX}{nii}"
 
 
+@lru_cache(maxsize=256)
+def aluno_qr_svg(nii: str) -> bytes:
+    """QR pessoal do aluno (`NII:<nii>`), em cache LRU.
+
+    O payload nunca muda para o mesmo aluno e o `qrcode` pure-Python custa
+    dezenas de ms por geração.
+    """
+    return qr_svg_bytes(build_payload(nii))
+
+
 def parse_payload(raw: str) -> str | None:
     """Extrai o NII de um payload scaneado. Aceita formatos:
     - `NII:123`    → '123'
@@ -88,4 +100,10 @@ def parse_payload(raw: str) -> str | None:
     return None
 
 
-__all__ = ["qr_svg_bytes", "build_payload", "parse_payload", "QR_PAYLOAD_PREFIX"]
+__all__ = [
+    "qr_svg_bytes",
+    "aluno_qr_svg",
+    "build_payload",
+    "parse_payload",
+    "QR_PAYLOAD_PREFIX",
+]
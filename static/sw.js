@@ -12,7 +12,7 @@
  *   2. resiliência se a rede falhar por segundos,
  *   3. poder instalar como PWA no ambiente escolar.
  */
-const CACHE_VERSION = 'v1';
+const CACHE_VERSION = 'v2';
 const STATIC_CACHE = `ref-static-${CACHE_VERSION}`;
 const PAGE_CACHE = `ref-pages-${CACHE_VERSION}`;
 
@@ -22,6 +22,7 @@ const STATIC_PRECACHE = [
   '/static/js/dynamic-styles.js',
   '/static/favicon.svg',
   '/static/logo_escola_naval.jpg',
+  '/static/logo_escola_naval_nav.jpg',
   '/static/manifest.json',
 ];
 
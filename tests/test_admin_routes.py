@@ -352,3 +352,12 @@ class TestAdminBackup:
         _login_admin(client)
         resp = client.get("/admin/backup-download")
         assert resp.status_code == 200
+
+    def test_backup_download_not_cacheable(self, app, client):
+        _login_admin(client)
+        resp = client.get("/admin/backup-download")
+        assert resp.status_code == 200
+        assert not resp.cache_control.public
+        assert resp.cache_control.max_age is None
+        assert resp.cache_control.no_store
+        resp.close()
@@ -201,6 +201,97 @@ class TestEnsureExtraSchemaFTS:
         assert result is not None
         os.unlink(db_path)
 
+    def test_fts_repopulated_in_background(self, monkeypatch):
+        """Após recriar a FTS, o thread de background repõe os nomes existentes."""
+        db_path = _fresh_db(monkeypatch)
+        _build_schema(db_path)
+        import core.database as database
+        from core.bootstrap import ensure_extra_schema
+
+        ensure_extra_schema()
+        with _conn(db_path) as conn:
+            conn.execute(
+                """INSERT INTO utilizadores
+                   (NII,NI,Nome_completo,Palavra_chave,ano,perfil,must_change_password)
+                   VALUES ('fts_bg','1','Zacarias Fonseca','pw','1','aluno',0)"""
+            )
+            conn.execute("DROP TABLE utilizadores_fts")
+            conn.commit()
+
+        ensure_extra_schema()
+        assert database._fts_thread is not None
+        database._fts_thread.join(timeout=10)
+
+        with _conn(db_path) as conn:
+            rows = conn.execute(
+                "SELECT rowid FROM utilizadores_fts WHERE utilizadores_fts MATCH ?",
+                ("Zacarias",),
+            ).fetchall()
+        assert len(rows) == 1
+        os.unlink(db_path)
+
+    def test_ensure_schema_repopulates_fts_in_background(self, monkeypatch):
+        """No arranque (ensure_schema) a FTS recriada também é repovoada em background."""
+        db_path = _fresh_db(monkeypatch)
+        _build_schema(db_path)
+        import core.database as database
+
+        with _conn(db_path) as conn:
+            conn.execute(
+                """INSERT INTO utilizadores
+                   (NII,NI,Nome_completo,Palavra_chave,ano,perfil,must_change_password)
+                   VALUES ('fts_boot','1','Ermelinda Quaresma','pw','1','aluno',0)"""
+            )
+            conn.execute("DROP TABLE utilizadores_fts")
+            conn.commit()
+
+        monkeypatch.setattr(database, "_fts_thread", None)
+        _build_schema(db_path)
+        assert database._fts_thread is not None
+        database._fts_thread.join(timeout=10)
+
+        with _conn(db_path) as conn:
+            rows = conn.execute(
+                "SELECT rowid FROM utilizadores_fts WHERE utilizadores_fts MATCH ?",
+                ("Quaresma",),
+            ).fetchall()
+        assert len(rows) == 1
+        os.unlink(db_path)
+
+    def test_fts_repair_leaves_caller_transaction_open(self, monkeypatch):
+        """_repair_fts não faz commit da transação de quem passou a conexão."""
+        db_path = _fresh_db(monkeypatch)
+        _build_schema(db_path)
+        import core.database as database
+        from core.migrations import _repair_fts
+
+        with _conn(db_path) as conn:
+            conn.execute("DROP TABLE utilizadores_fts")
+            for trg in ("ai", "ad", "au"):
+                conn.execute(f"DROP TRIGGER utilizadores_{trg}_fts")
+            conn.commit()
+
+        conn = _conn(db_path)
+        try:
+            conn.execute(
+                """INSERT INTO utilizadores
+                   (NII,NI,Nome_completo,Palavra_chave,ano,perfil,must_change_password)
+                   VALUES ('fts_tx','1','Transacao Aberta','pw','1','aluno',0)"""
+            )
+            _repair_fts(conn)
+            assert conn.in_transaction
+            conn.rollback()
+        finally:
+            conn.close()
+        database._fts_thread.join(timeout=10)
+
+        with _conn(db_path) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM utilizadores WHERE NII='fts_tx'"
+            ).fetchone()
+        assert row is None
+        os.unlink(db_path)
+
     def test_fts_triggers_recreated_after_drop(self, monkeypatch):
         """After FTS rebuild, all three triggers must exist."""
         db_path = _fresh_db(monkeypatch)
@@ -393,6 +484,48 @@ class TestEnsureExtraSchemaMigracoes:
         assert row["Palavra_chave"] == "sentinel"
         os.unlink(db_path)
 
+    def test_user_version_skips_migration_lookup(self, monkeypatch):
+        """Com user_version em dia, run_migrations não volta a consultar _migracoes."""
+        db_path = _fresh_db(monkeypatch)
+        _build_schema(db_path)
+        from core.bootstrap import ensure_extra_schema
+        from core.migrations import SCHEMA_VERSION, run_migrations
+
+        ensure_extra_schema()
+
+        with _conn(db_path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            conn.execute("DELETE FROM _migracoes WHERE nome='reset_creds_nii_v2'")
+            conn.commit()
+
+        assert run_migrations() == []
+        os.unlink(db_path)
+
+    def test_pending_migrations_are_atomic(self, monkeypatch):
+        """Se uma migração falha, as anteriores do mesmo lote são revertidas."""
+        db_path = _fresh_db(monkeypatch)
+        _build_schema(db_path)
+        import core.migrations as mig
+
+        def _ok(conn):
+            conn.execute("ALTER TABLE utilizadores ADD COLUMN tmp_atomic TEXT")
+
+        def _boom(conn):
+            raise RuntimeError("falha simulada")
+
+        monkeypatch.setattr(mig, "MIGRATIONS", [("t_ok", _ok), ("t_boom", _boom)])
+        monkeypatch.setattr(mig, "SCHEMA_VERSION", 2)
+
+        assert mig.run_migrations() == []
+
+        with _conn(db_path) as conn:
+            assert "tmp_atomic" not in mig._cols(conn, "utilizadores")
+            done = {
+                r[0] for r in conn.execute("SELECT nome FROM _migracoes").fetchall()
+            }
+        assert "t_ok" not in done
+        os.unlink(db_path)
+
 
 # ---------------------------------------------------------------------------
 # bootstrap_dev_accounts
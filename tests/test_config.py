@@ -4,8 +4,11 @@ tests/test_config.py — Testes para config.py
 
 import json
 import logging
+import os
 import sys
 
+import pytest
+
 
 # ── JsonFormatter ─────────────────────────────────────────────────────────────
 
@@ -32,10 +35,9 @@ def _get_json_formatter():
 
     # The handler added by configure_logging uses JsonFormatter
     for h in mock_app.logger.handlers:
-        if isinstance(h, logging.StreamHandler) and hasattr(h.formatter, "format"):
-            fmt = h.formatter
-            if fmt.__class__.__name__ == "JsonFormatter":
-                return fmt
+        fmt = h.formatter
+        if fmt is not None and fmt.__class__.__name__ == "JsonFormatter":
+            return fmt
     raise RuntimeError("JsonFormatter not found")
 
 
@@ -158,6 +160,67 @@ def test_configure_logging_sets_sqlite_level(monkeypatch):
     assert logging.getLogger("sqlite3").level == logging.WARNING
 
 
+def test_configure_logging_writes_via_queue_listener(monkeypatch, capsys):
+    """O handler da app é um QueueHandler; o listener escreve a linha formatada."""
+    import logging.handlers
+    import time
+    import types
+    import config as cfg
+
+    monkeypatch.setattr(cfg, "is_production", True)
+
+    mock_logger = logging.getLogger("test_configure_queue")
+    mock_logger.handlers.clear()
+    mock_logger.propagate = False
+    mock_app = types.SimpleNamespace(logger=mock_logger)
+
+    cfg.configure_logging(mock_app)
+    assert isinstance(mock_app.logger.handlers[-1], logging.handlers.QueueHandler)
+
+    mock_logger.info("via fila %s", "ok")
+    out = ""
+    for _ in range(100):  # escrita assíncrona — esperar pelo listener
+        out += capsys.readouterr().out
+        if "via fila ok" in out:
+            break
+        time.sleep(0.01)
+    line = next(ln for ln in out.splitlines() if "via fila ok" in ln)
+    assert json.loads(line)["msg"] == "via fila ok"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer os.fork")
+def test_configure_logging_listener_runs_after_fork(monkeypatch):
+    """Workers criados por fork (gunicorn --preload) continuam a esvaziar a fila."""
+    import time
+    import types
+    import config as cfg
+
+    monkeypatch.setattr(cfg, "is_production", True)
+
+    mock_logger = logging.getLogger("test_configure_fork")
+    mock_logger.handlers.clear()
+    mock_logger.propagate = False
+    mock_app = types.SimpleNamespace(logger=mock_logger)
+
+    cfg.configure_logging(mock_app)
+    handler = mock_app.logger.handlers[-1]
+
+    pid = os.fork()
+    if pid == 0:  # filho: sem listener a fila nunca esvazia
+        code = 1
+        try:
+            mock_logger.info("no worker")
+            for _ in range(200):
+                if handler.queue.empty():
+                    code = 0
+                    break
+                time.sleep(0.01)
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
 # ── SECRET_KEY generation ─────────────────────────────────────────────────────
 
 
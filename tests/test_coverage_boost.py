@@ -820,6 +820,15 @@ class TestHelpersRender:
             assert resp.status_code == 404
 
 
+class TestHelpersAnoLabel:
+    def test_ano_label_known_and_fallback(self):
+        from utils.helpers import _ano_label
+
+        assert _ano_label(7) == "CFBO"
+        assert _ano_label("2") == "2\u00ba Ano"
+        assert _ano_label(9) == "9\u00ba Ano"
+
+
 class TestHelpersPrazoLabel:
     """Cobertura da _prazo_label — linhas 136-140 (branch h <= 24)."""
 
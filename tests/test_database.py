@@ -4,6 +4,8 @@ tests/test_database.py — Testes para core/database.py
 
 import sqlite3
 
+import pytest
+
 
 # ── wal_checkpoint ────────────────────────────────────────────────────────────
 
@@ -209,3 +211,89 @@ def test_close_request_db_falls_back_when_flask_import_fails(monkeypatch):
 
     # Deve executar silenciosamente sem lançar
     database.close_request_db()
+
+
+# ── db_read ──────────────────────────────────────────────────────────────────
+
+
+def test_db_read_closes_own_connection_outside_request(app, monkeypatch):
+    """Fora de request (CLI), db_read() abre uma conexão própria e fecha-a."""
+    from core.database import db_read
+
+    # pytest-flask empurra um request context por teste; simulamos CLI/cron.
+    monkeypatch.setattr("flask.has_request_context", lambda: False)
+
+    with db_read() as conn:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_db_read_uses_request_connection(app):
+    """Dentro de um request, db_read() reutiliza a conexão do request."""
+    from core.database import db, db_read
+
+    with app.test_request_context("/"):
+        with db_read() as conn:
+            assert conn is db()
+
+
+# ── pragmas ──────────────────────────────────────────────────────────────────
+
+
+def test_new_conn_applies_pragmas(app):
+    """Conexões novas herdam WAL do ficheiro e aplicam os pragmas por-conexão."""
+    from core.database import _new_conn
+
+    conn = _new_conn()
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 8000
+        # Restauro reescreve o ficheiro in-place — mmap daria SIGBUS.
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+# ── FTS probe ────────────────────────────────────────────────────────────────
+
+
+def test_fts_healthy_probe_avoids_full_scan():
+    """fts_healthy distingue tabela ausente de saudável sem `COUNT(*)`."""
+    from core.database import fts_healthy
+
+    conn = sqlite3.connect(":memory:")
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    try:
+        conn.execute(
+            "CREATE TABLE utilizadores (id INTEGER PRIMARY KEY, Nome_completo)"
+        )
+        assert fts_healthy(conn) is False
+        conn.execute(
+            "CREATE VIRTUAL TABLE utilizadores_fts USING fts5(Nome_completo,"
+            " content='utilizadores', content_rowid='id')"
+        )
+        assert fts_healthy(conn) is True
+    finally:
+        conn.close()
+    assert not any("COUNT(" in s.upper() for s in statements)
+
+
+def test_populate_fts_does_not_recreate_missing_db_file(tmp_path):
+    """O rebuild em background nunca cria uma BD vazia se o ficheiro sumiu."""
+    from core import database
+
+    path = tmp_path / "gone.db"
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        path.unlink()
+        database.populate_fts(conn)
+        database._fts_thread.join(timeout=10)
+    finally:
+        conn.close()
+    assert not path.exists()
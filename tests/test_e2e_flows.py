@@ -550,6 +550,76 @@ class TestA11yAndTemplates:
         assert resp.status_code == 200
         assert b"<svg" in resp.data
 
+    def test_logo_served_with_cache_max_age(self, app, client):
+        """Logo é um asset estático com Cache-Control max-age (cacheável)."""
+        import config as cfg
+
+        html = client.get("/login").data.decode()
+        assert "/static/logo_escola_naval.jpg" in html
+        resp = client.get("/static/logo_escola_naval.jpg")
+        assert resp.status_code == 200
+        assert resp.cache_control.max_age == cfg.STATIC_MAX_AGE
+        resp.close()
+
+    def test_logo_conditional_get_returns_304(self, app, client):
+        """Revisita com If-None-Match recebe 304 sem corpo (0 bytes do logo)."""
+        first = client.get("/static/logo_escola_naval.jpg")
+        etag = first.headers.get("ETag")
+        first.close()
+        assert etag
+        resp = client.get(
+            "/static/logo_escola_naval.jpg", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.data == b""
+
+    def test_css_served_gzip_when_accepted(self, app, client):
+        """CSS é servido pré-comprimido em gzip e revalida com 304."""
+        import gzip
+        from pathlib import Path
+
+        raw = (Path(app.static_folder) / "css" / "app.css").read_bytes()
+        hdrs = {"Accept-Encoding": "gzip, br"}
+        resp = client.get("/static/css/app.css", headers=hdrs)
+        assert resp.status_code == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert len(resp.data) < len(raw)
+        assert gzip.decompress(resp.data) == raw
+        assert "Accept-Ranges" not in resp.headers
+        etag = resp.headers["ETag"]
+        assert etag.endswith('-gz"')
+        again = client.get(
+            "/static/css/app.css", headers={**hdrs, "If-None-Match": etag}
+        )
+        assert again.status_code == 304
+        assert again.data == b""
+
+    def test_static_range_request_not_gzipped(self, app, client):
+        """Pedido com Range recebe os bytes do ficheiro original, sem gzip."""
+        from pathlib import Path
+
+        raw = (Path(app.static_folder) / "css" / "app.css").read_bytes()
+        resp = client.get(
+            "/static/css/app.css",
+            headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99"},
+        )
+        assert resp.status_code == 206
+        assert "Content-Encoding" not in resp.headers
+        assert resp.data == raw[:100]
+        resp.close()
+
+    def test_static_not_gzipped_without_accept_or_for_images(self, app, client):
+        """Sem Accept-Encoding: gzip, ou para JPEG, o ficheiro segue intacto."""
+        resp = client.get("/static/css/app.css")
+        assert "Content-Encoding" not in resp.headers
+        resp.close()
+        resp = client.get(
+            "/static/logo_escola_naval.jpg", headers={"Accept-Encoding": "gzip"}
+        )
+        assert "Content-Encoding" not in resp.headers
+        resp.close()
+
     def test_meta_tags_present(self, app, client):
         """Meta tags de descrição e theme-color estão presentes."""
         resp = client.get("/login")
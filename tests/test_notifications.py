@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -15,6 +16,7 @@ from core.notifications import (
     WebhookNotifier,
     _build_notifier,
     notify,
+    notify_async,
     reset_notifier_cache,
 )
 
@@ -263,6 +265,19 @@ def test_smtp_swallows_exceptions():
         ).notify("t", "m")
 
 
+def test_notify_async_runs_in_pool(monkeypatch):
+    seen = []
+
+    class _Rec:
+        def notify(self, title, message, severity="info"):
+            seen.append((title, severity, threading.current_thread().name))
+
+    monkeypatch.setattr(notifications, "_get_notifier", lambda: _Rec())
+    notify_async("T", "m", "warning").result(timeout=5)
+    assert seen[0][:2] == ("T", "warning")
+    assert seen[0][2].startswith("notif")
+
+
 # ── cache ─────────────────────────────────────────────────────────────────
 
 
@@ -4,6 +4,7 @@ tests/test_performance.py — Testes para otimizações de performance
 - Conexão por request (reutilização via Flask g)
 - Batch loading (eliminar N+1)
 - WAL checkpoint
+- Índices compostos (planos de query)
 - Timeout de sessão
 """
 
@@ -132,6 +133,83 @@ class TestWALCheckpoint:
         wal_checkpoint()  # Não deve lançar exceção
 
 
+# ─── Índices compostos ───────────────────────────────────────────────────
+
+
+class TestIndexUsage:
+    @staticmethod
+    def _plan(sql, params):
+        with db() as conn:
+            rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return " ".join(r["detail"] for r in rows)
+
+    def test_ausencia_ativa_uses_covering_index(self, app):
+        """A query de `_tem_ausencia_ativa` é SEARCH no índice composto."""
+        plan = self._plan(
+            "SELECT 1 FROM ausencias WHERE utilizador_id=?"
+            " AND ausente_de<=? AND ausente_ate>=?",
+            (1, "2025-01-01", "2025-01-01"),
+        )
+        assert "COVERING INDEX idx_ausencias_uid_datas" in plan
+
+    def test_detencao_ativa_uses_covering_index(self, app):
+        plan = self._plan(
+            "SELECT 1 FROM detencoes WHERE utilizador_id=?"
+            " AND detido_de<=? AND detido_ate>=? LIMIT 1",
+            (1, "2025-01-01", "2025-01-01"),
+        )
+        assert "COVERING INDEX idx_detencoes_uid_datas" in plan
+
+
+# ─── Auditoria (group commit por request) ───────────────────────────────
+
+
+class TestAuditGroupCommit:
+    @staticmethod
+    def _count(action):
+        conn = _new_conn()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM admin_audit_log WHERE action=?", (action,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_audit_deferred_until_flush(self, app):
+        """Dentro de um request, _audit só grava no flush (um único commit)."""
+        from utils.helpers import _audit, flush_audit
+
+        with app.test_request_context("/"):
+            _audit("perf", "perf_group_commit", "a")
+            _audit("perf", "perf_group_commit", "b")
+            assert self._count("perf_group_commit") == 0
+            flush_audit()
+        assert self._count("perf_group_commit") == 2
+
+    def test_audit_written_at_request_teardown(self, app):
+        """O teardown do request grava as entradas pendentes."""
+        from utils.helpers import _audit
+
+        with app.test_request_context("/"):
+            _audit("perf", "perf_teardown", "")
+        assert self._count("perf_teardown") == 1
+
+    def test_audit_flush_after_error_discards_view_writes(self, app):
+        """Request falhado: a auditoria é gravada sem fazer commit da view."""
+        from core.database import db
+        from utils.helpers import _audit, flush_audit
+
+        with app.test_request_context("/"):
+            db().execute(
+                "INSERT INTO admin_audit_log(actor,action,detail)"
+                " VALUES('perf','perf_view_write','')"
+            )
+            _audit("perf", "perf_after_error", "")
+            flush_audit(RuntimeError("view falhou"))
+        assert self._count("perf_after_error") == 1
+        assert self._count("perf_view_write") == 0
+
+
 # ─── Session timeout ─────────────────────────────────────────────────────
 
 
@@ -6,7 +6,12 @@ tests/test_refeicoes.py — Testes do core de refeições
 from datetime import date, timedelta
 
 from core.database import db
-from core.meals import get_totais_dia, refeicao_get, refeicao_save
+from core.meals import (
+    get_totais_dia,
+    refeicao_get,
+    refeicao_save,
+    refeicoes_save_batch,
+)
 
 from tests.conftest import create_aluno, get_csrf, login_as
 
@@ -156,6 +161,32 @@ class TestRefeicaoSave:
         assert got["jantar_sai_unidade"] == 0
 
 
+class TestRefeicoesSaveBatch:
+    def test_batch_saves_all_days_and_logs(self, app):
+        """Lote grava todos os dias numa transação e regista o log por dia."""
+        uid, _ = _setup_aluno(app)
+        dias = [_future_date(20 + i) for i in range(3)]
+        itens = [(d, {"pequeno_almoco": 1, "almoco": "Normal"}) for d in dias]
+
+        assert refeicoes_save_batch(uid, itens, alterado_por="batch") is True
+        for d in dias:
+            got = refeicao_get(uid, d)
+            assert got["pequeno_almoco"] == 1
+            assert got["almoco"] == "Normal"
+
+        with db() as conn:
+            n = conn.execute(
+                "SELECT COUNT(DISTINCT data_refeicao) FROM refeicoes_log"
+                " WHERE utilizador_id=? AND alterado_por='batch'",
+                (uid,),
+            ).fetchone()[0]
+        assert n == 3
+
+    def test_batch_empty_is_noop(self, app):
+        uid, _ = _setup_aluno(app)
+        assert refeicoes_save_batch(uid, []) is True
+
+
 class TestRefeicaoAuditLog:
     def test_meal_change_logged(self, app):
         """Alteração de refeição cria entrada no log de auditoria."""
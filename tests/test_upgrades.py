@@ -172,6 +172,21 @@ class TestPWA:
         # Ícones declarados
         assert len(data["icons"]) >= 1
 
+    def test_manifest_icones_com_dimensoes_declaradas(self, client):
+        """Ícones raster do manifest existem com o tamanho (quadrado) declarado."""
+        import json
+
+        Image = pytest.importorskip("PIL.Image")  # vem com o reportlab
+
+        data = json.loads(client.get("/static/manifest.json").data)
+        raster = [i for i in data["icons"] if i["sizes"] != "any"]
+        assert {i["sizes"] for i in raster} >= {"192x192", "512x512"}
+        root = os.path.dirname(os.path.dirname(__file__))
+        for icon in raster:
+            w, h = (int(v) for v in icon["sizes"].split("x"))
+            with Image.open(os.path.join(root, icon["src"].lstrip("/"))) as im:
+                assert im.size == (w, h)
+
     def test_sw_js_servido(self, client):
         resp = client.get("/static/sw.js")
         assert resp.status_code == 200
@@ -256,6 +271,59 @@ class TestDietasPermanentes:
         assert _full_default("Vegetariano")["jantar_tipo"] == "Vegetariano"
         assert _full_default("Dieta")["almoco"] == "Dieta"
 
+    def test_autofill_dias_ocupados(self, app):
+        """Uma só query devolve dias com refeição existente ou ausência ativa."""
+        from core.database import db
+        from core.meals import _dias_ocupados, refeicao_save
+
+        uid = create_aluno("dietas_oc1", "DO01", "Aluno Ocupado", ano="1")
+        d0 = date.today() + timedelta(days=30)
+        d1, d2 = d0 + timedelta(days=1), d0 + timedelta(days=2)
+        refeicao_save(uid, d0, {"pequeno_almoco": 1})
+        with db() as conn:
+            conn.execute(
+                "INSERT INTO ausencias (utilizador_id, ausente_de, ausente_ate,"
+                " motivo, criado_por) VALUES (?,?,?,?,?)",
+                (uid, d1.isoformat(), d1.isoformat(), "teste", "teste"),
+            )
+            conn.commit()
+
+            ocupados = _dias_ocupados(conn, [d0, d1, d2])
+            assert (uid, d0.isoformat()) in ocupados
+            assert (uid, d1.isoformat()) in ocupados
+            assert (uid, d2.isoformat()) not in ocupados
+            assert _dias_ocupados(conn, []) == set()
+            # Com `uid`, só os dias desse utilizador.
+            so_uid = _dias_ocupados(conn, [d0, d1, d2], uid)
+            assert so_uid == {(uid, d0.isoformat()), (uid, d1.isoformat())}
+
+    def test_autofill_nao_sobrepoe_edicao_apos_snapshot(self, app, monkeypatch):
+        """Refeição gravada depois do snapshot `ocupados` não é reescrita pelo cron."""
+        import core.autofill as autofill
+        from core.database import db
+        from core.meals import refeicao_get, refeicao_save
+
+        uid = create_aluno("dietas_oc2", "DO02", "Aluno Concorrente", ano="1")
+        d = date.today() + timedelta(days=1)
+        if not autofill.dia_tem_refeicoes(d):
+            pytest.skip("dia sem refeições no calendário")
+        # Snapshot desatualizado: não vê a edição feita entretanto pelo aluno.
+        monkeypatch.setattr(autofill, "_dias_ocupados", lambda conn, dias: set())
+        refeicao_save(uid, d, {"pequeno_almoco": 0, "almoco": None}, "dietas_oc2")
+
+        autofill.autopreencher_refeicoes_semanais(dias_a_gerar=3)
+
+        got = refeicao_get(uid, d)
+        assert got["pequeno_almoco"] == 0
+        assert got["almoco"] is None
+        with db() as conn:
+            n = conn.execute(
+                "SELECT COUNT(*) FROM refeicoes_log WHERE utilizador_id=?"
+                " AND data_refeicao=? AND alterado_por='sistema'",
+                (uid, d.isoformat()),
+            ).fetchone()[0]
+        assert n == 0
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # #18 — PDF export
@@ -378,6 +446,14 @@ class TestQRHelpers:
         body = out.decode("utf-8")
         assert "<svg" in body
 
+    def test_aluno_qr_svg_cached(self, app):
+        """Só o QR pessoal (estável) fica em cache; tokens rotativos não."""
+        from core.qr import aluno_qr_svg, qr_svg_bytes
+
+        assert aluno_qr_svg("cache") is aluno_qr_svg("cache")
+        assert b"<svg" in aluno_qr_svg("cache")
+        assert not hasattr(qr_svg_bytes, "cache_info")
+
     def test_qr_svg_bytes_fallback(self, app, monkeypatch):
         """Se `qrcode` não importa, devolve SVG fallback com o texto legível."""
         import builtins
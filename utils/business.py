@@ -12,15 +12,15 @@ from datetime import date, datetime, timedelta
 from flask import current_app
 
 from core.constants import PRAZO_LIMITE_HORAS
-from core.database import db
+from core.database import db, db_read
 from core.meals import (
     get_ocupacao_capacidade,
     refeicao_editavel,
     refeicao_get,
     refeicao_save,
+    refeicoes_save_batch,
 )
 import config as cfg
-from utils.helpers import _refeicao_set
 
 
 def _horarios_sobrepoe(
@@ -277,7 +277,7 @@ def _editar_ausencia(
 def _tem_ausencia_ativa(uid: int, d: date | None = None) -> bool:
     """Verifica se utilizador tem ausência ativa na data (ou hoje)."""
     d_str = (d or date.today()).isoformat()
-    with db() as conn:
+    with db_read() as conn:
         row = conn.execute(
             """SELECT 1 FROM ausencias WHERE utilizador_id=?
                               AND ausente_de<=? AND ausente_ate>=?""",
@@ -293,7 +293,7 @@ def _tem_detencao_ativa(uid: int, d: date | None = None) -> bool:
     """Verifica se utilizador tem detenção ativa na data (ou hoje)."""
     try:
         d_str = (d or date.today()).isoformat()
-        with db() as conn:
+        with db_read() as conn:
             row = conn.execute(
                 """SELECT 1 FROM detencoes WHERE utilizador_id=?
                               AND detido_de<=? AND detido_ate>=? LIMIT 1""",
@@ -304,6 +304,18 @@ def _tem_detencao_ativa(uid: int, d: date | None = None) -> bool:
         return False
 
 
+# Refeição completa marcada automaticamente em dias de detenção.
+_REFEICAO_DETIDO = {
+    "pequeno_almoco": 1,
+    "lanche": 1,
+    "almoco": "Normal",
+    "jantar_tipo": "Normal",
+    "jantar_sai_unidade": 0,
+    "almoco_estufa": 0,
+    "jantar_estufa": 0,
+}
+
+
 def _auto_marcar_refeicoes_detido(
     uid: int, d_de: date, d_ate: date, alterado_por: str = "sistema"
 ) -> None:
@@ -318,21 +330,15 @@ def _auto_marcar_refeicoes_detido(
                     (uid, d_de.isoformat(), d_ate.isoformat()),
                 ).fetchall()
             }
-        # Marcar apenas os dias sem almoço
+        # Marcar apenas os dias sem almoço — todos numa só transação.
+        # `.copy()` porque o UPSERT pode alterar o dict (jantar_sai_unidade).
+        pendentes = []
         d = d_de
         while d <= d_ate:
             if d.isoformat() not in existentes:
-                _refeicao_set(
-                    uid,
-                    d,
-                    pa=1,
-                    lanche=1,
-                    alm="Normal",
-                    jan="Normal",
-                    sai=0,
-                    alterado_por=alterado_por,
-                )
+                pendentes.append((d, _REFEICAO_DETIDO.copy()))
             d += timedelta(days=1)
+        refeicoes_save_batch(uid, pendentes, alterado_por=alterado_por)
     except Exception as exc:
         current_app.logger.warning(f"_auto_marcar_refeicoes_detido uid={uid}: {exc}")
 
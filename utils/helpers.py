@@ -17,7 +17,7 @@ from flask import (
 from markupsafe import Markup, escape
 
 from core.constants import PRAZO_LIMITE_HORAS
-from core.database import db
+from core.database import db, db_read
 from core.meals import refeicao_editavel, refeicao_save
 
 from utils.constants import ANOS_LABELS
@@ -123,12 +123,13 @@ def _parse_date_strict(s: str | None) -> date | None:
 
 def _ano_label(ano: int | str | None) -> str:
     """Label legível para um ano escolar."""
-    return ANOS_LABELS.get(int(ano) if ano else 0, f"{ano}\u00ba Ano")
+    label = ANOS_LABELS.get(int(ano) if ano else 0)
+    return label if label is not None else f"{ano}\u00ba Ano"
 
 
 def _get_anos_disponiveis() -> list[int]:
     """Anos com alunos na BD."""
-    with db() as conn:
+    with db_read() as conn:
         rows = conn.execute(
             "SELECT DISTINCT CAST(ano AS INTEGER) AS ano FROM utilizadores"
             " WHERE ano IS NOT NULL AND ano != '' AND CAST(ano AS INTEGER) > 0"
@@ -204,22 +205,51 @@ def _prazo_label(d: date) -> Markup:
 
 
 def _audit(actor: str, action: str, detail: str = "") -> None:
-    """Regista uma entrada de auditoria na tabela admin_audit_log + log estruturado."""
-    from flask import g
+    """Regista uma entrada de auditoria na tabela admin_audit_log + log estruturado.
+
+    Dentro de um request a entrada fica pendente em `g` e é gravada no
+    teardown (`flush_audit`) — um só commit para todas as entradas do request.
+    """
+    from flask import g, has_request_context
 
     rid = getattr(g, "request_id", "-") if g else "-"
     current_app.logger.info(
         "action=%s actor=%s detail=%s rid=%s", action, actor, detail, rid
     )
+    if has_request_context():
+        g.setdefault("_audit_pending", []).append((actor, action, detail))
+        return
+    _write_audit([(actor, action, detail)])
+
+
+def _write_audit(rows: list[tuple[str, str, str]]) -> None:
     try:
+        # DDL vive em SCHEMA_SQL (arranque); aqui só o INSERT — o `with` faz commit.
         with db() as conn:
-            conn.execute(
+            conn.executemany(
                 "INSERT INTO admin_audit_log(actor,action,detail) VALUES(?,?,?)",
-                (actor, action, detail),
+                rows,
             )
-            conn.commit()
     except Exception as exc:
-        current_app.logger.warning(f"_audit falhou [{action}]: {exc}")
+        actions = ",".join(sorted({r[1] for r in rows}))
+        current_app.logger.warning(f"_audit falhou [{actions}]: {exc}")
+
+
+def flush_audit(exc: BaseException | None = None) -> None:
+    """Grava as entradas de auditoria pendentes do request (teardown_request).
+
+    Se o request falhou, a transação que a view deixou aberta é revertida antes
+    — o commit da auditoria não pode levar consigo escritas de um request falhado.
+    """
+    from flask import g
+
+    pending = g.pop("_audit_pending", None)
+    if not pending:
+        return
+    conn = g.get("_sr_db")
+    if exc is not None and conn is not None and conn.in_transaction:
+        conn.rollback()
+    _write_audit(pending)
 
 
 def _client_ip() -> str: